@@ -1,45 +1,70 @@
+import logging
+import re
+import sys
+import threading
+import weakref
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections import deque
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Protocol, Union, final
 
-# === INTERFACES ===
+logger = logging.getLogger(__name__)
 
-class ITransfer(ABC):
-    @abstractmethod
-    def transfer(self, amount: float, to_account: "BankAccount") -> bool:
-        pass
+_EMAIL_RE = re.compile(r"\A[^@\s]+@[^@\s]+\.[^@\s]+\Z")
 
+# === VALIDATORS ===
 
-class IVerifyCreditCard(ABC):
-    @abstractmethod
-    def verify_credit_card(self, card_number: str) -> bool:
-        pass
+def is_valid_card_format(card_number: str) -> bool:
+    return (len(card_number) == 16 and card_number.isascii()
+            and card_number.isdigit())
 
-    @staticmethod
-    def is_valid_card_format(card_number: str) -> bool:
-        return card_number.isdigit() and len(card_number) == 16
 
+@lru_cache(maxsize=4096)
+def is_valid_email_format(email: str) -> bool:
+    at = email.find("@")
+    if at <= 0 or email.find(".", at) < 0:
+        return False
+    return _EMAIL_RE.match(email) is not None
 
-class IVerifyPayPal(ABC):
-    @abstractmethod
-    def verify_paypal_email(self, email: str) -> bool:
-        pass
 
-    @staticmethod
-    def is_valid_email_format(email: str) -> bool:
-        return "@" in email and "." in email
+# === INTERFACES ===
+
+class ITransfer(Protocol):
+    def transfer(self, amount: float, to_account: "BankAccount") -> bool: ...
+
+
+class IVerifyCreditCard(Protocol):
+    def verify_credit_card(self, card_number: Union[str, int]) -> bool: ...
+
+
+class IVerifyPayPal(Protocol):
+    def verify_paypal_email(self, email: str) -> bool: ...
 
 
 # === BANK ACCOUNT ===
 
-class BankAccount(ITransfer, IVerifyCreditCard, IVerifyPayPal):
+def _announce_deleted(account_id: str):
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("\n🗑️ Account %s deleted from system.", account_id)
+
+
+class BankAccount:
+    # satisfies ITransfer, IVerifyCreditCard and IVerifyPayPal structurally
+    __slots__ = ("_id", "_balance", "_credit_card_number", "_paypal_email",
+                 "_history", "__weakref__")
+
     def __init__(self, id: str, balance: float,
                  credit_card_number: Optional[str] = None,
                  paypal_email: Optional[str] = None):
-        self._id = id
+        self._id = sys.intern(id)
         self._balance = balance
+        # malformed numbers are kept as given, as before; only the setter validates
+        if credit_card_number is not None and is_valid_card_format(credit_card_number):
+            credit_card_number = int(credit_card_number)
         self._credit_card_number = credit_card_number
         self._paypal_email = paypal_email
-        self._history = []
+        self._history = deque()
+        weakref.finalize(self, _announce_deleted, self._id)
 
     @property
     def id(self):
@@ -57,13 +82,16 @@ class BankAccount(ITransfer, IVerifyCreditCard, IVerifyPayPal):
 
     @property
     def credit_card_number(self):
-        return self._credit_card_number
+        number = self._credit_card_number
+        if isinstance(number, int):
+            return f"{number:016d}"
+        return number
 
     @credit_card_number.setter
     def credit_card_number(self, number: str):
-        if not IVerifyCreditCard.is_valid_card_format(number):
+        if not is_valid_card_format(number):
             raise ValueError("Invalid credit card format")
-        self._credit_card_number = number
+        self._credit_card_number = int(number)
 
     @property
     def paypal_email(self):
@@ -71,33 +99,54 @@ class BankAccount(ITransfer, IVerifyCreditCard, IVerifyPayPal):
 
     @paypal_email.setter
     def paypal_email(self, email: str):
-        if not IVerifyPayPal.is_valid_email_format(email):
+        if not is_valid_email_format(email):
             raise ValueError("Invalid email format")
         self._paypal_email = email
 
-    def add_history(self, desc: str):
-        self._history.append(desc)
+    @final
+    def _debit(self, amount: float):
+        self._balance -= amount
+
+    @final
+    def _credit(self, amount: float):
+        self._balance += amount
+
+    def add_history(self, kind: str, amount: float, other_id: str):
+        self._history.append((kind, amount, other_id))
+
+    def format_history(self) -> str:
+        lines = [f"\n== account history {self._id} =="]
+        for kind, amount, other_id in self._history:
+            direction = "to" if kind == "send" else "from"
+            lines.append(f"{kind} {amount} ₪ {direction}-{other_id}")
+        return "\n".join(lines) + "\n"
 
     def print_history(self):
-        print(f"\n== account history {self._id} ==")
-        for line in self._history:
-            print(line)
+        sys.stdout.write(self.format_history())
 
     def transfer(self, amount: float, to_account: "BankAccount") -> bool:
-        if self._id == to_account._id:
-            print("Cannot transfer to yourself")
+        own_id = self._id
+        to_id = to_account._id
+        if own_id == to_id:
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("Cannot transfer to yourself")
             return False
         if self._balance >= amount:
-            self._balance -= amount
-            to_account._balance += amount
-            self.add_history(f"send {amount} ₪ to-{to_account._id}")
-            to_account.add_history(f"reciev {amount} ₪ from-{self._id}")
-            print(f"The transfer amounting to {amount} ₪ from-{self._id} ל-{to_account._id}")
+            self._debit(amount)
+            to_account._credit(amount)
+            self.add_history("send", amount, to_id)
+            to_account.add_history("reciev", amount, own_id)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("The transfer amounting to %s ₪ from-%s ל-%s", amount, own_id, to_id)
             return True
-        print(f"Failure: There is not enough money in the account {self._id}")
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning("Failure: There is not enough money in the account %s", own_id)
         return False
 
-    def verify_credit_card(self, card_number: str) -> bool:
+    def verify_credit_card(self, card_number: Union[str, int]) -> bool:
+        if isinstance(card_number, str):
+            if is_valid_card_format(card_number):
+                card_number = int(card_number)
         return self._credit_card_number == card_number
 
     def verify_paypal_email(self, email: str) -> bool:
@@ -107,49 +156,105 @@ class BankAccount(ITransfer, IVerifyCreditCard, IVerifyPayPal):
         return f"Account: {self._id} | balance: {self._balance:.2f} ₪"
 
     def __repr__(self):
-        return f"BankAccount('{self._id}', {self._balance}, '{self._credit_card_number}', '{self._paypal_email}')"
-
-    def __del__(self):
-        print(f"\n🗑️ Account {self._id} deleted from system.")
+        return f"BankAccount('{self._id}', {self._balance}, '{self.credit_card_number}', '{self._paypal_email}')"
 
 
 # === PAYMENT (ABSTRACT) ===
 
+class _BatchState(threading.local):
+    # per-thread state of Payment.create_batch; class defaults avoid a getattr fallback
+    active = False
+    count = 0
+
+
 class Payment(ABC):
+    __slots__ = ("amount", "from_account_id", "to_account_id")
     _total_payments = 0
+    _batch = _BatchState()
 
     def __init__(self, amount: float, from_account_id: str, to_account_id: str):
         self.amount = amount
-        self.from_account_id = from_account_id
-        self.to_account_id = to_account_id
-        Payment._total_payments += 1
+        self.from_account_id = sys.intern(from_account_id)
+        self.to_account_id = sys.intern(to_account_id)
+        batch = Payment._batch
+        if batch.active:
+            batch.count += 1
+        else:
+            Payment._total_payments += 1
 
     @staticmethod
     def get_total_payments():
         return Payment._total_payments
 
+    @staticmethod
+    def create_batch(records: Iterable[tuple]) -> list["Payment"]:
+        # records are (payment_class, *args); payments built here are counted
+        # with one update at the end instead of one per payment
+        batch = Payment._batch
+        outer = batch.active, batch.count  # restored so nested batches count correctly
+        batch.active, batch.count = True, 0
+        try:
+            return [payment_cls(*args) for payment_cls, *args in records]
+        finally:
+            Payment._total_payments += batch.count
+            batch.active, batch.count = outer
+
     @abstractmethod
     def process(self, accounts: dict[str, BankAccount]) -> bool:
         pass
 
+    @staticmethod
+    def iter_process(batch: Iterable["Payment"],
+                     accounts: dict[str, BankAccount]) -> Iterator[tuple["Payment", bool]]:
+        # lazy: each payment is processed only when its result is pulled, in order,
+        # since later payments may depend on earlier balances
+        for payment in batch:
+            try:
+                success = payment.process(accounts)
+            except KeyError as missing:
+                # only a failed lookup of this payment's own IDs is an unknown account
+                account_id = missing.args[0] if missing.args else None
+                if (account_id not in (payment.from_account_id, payment.to_account_id)
+                        or account_id in accounts):
+                    raise
+                if logger.isEnabledFor(logging.WARNING):
+                    logger.warning("Failure: unknown account %s", account_id)
+                success = False
+            yield payment, success
+
 
 # === CREDIT CARD PAYMENT ===
 
 class CreditCardPayment(Payment):
+    __slots__ = ("_card_number", "_card_int")
+
     def __init__(self, amount, from_id, to_id, card_number):
         super().__init__(amount, from_id, to_id)
         self.card_number = card_number
 
+    @property
+    def card_number(self):
+        return self._card_number
+
+    @card_number.setter
+    def card_number(self, number: str):
+        self._card_number = number
+        self._card_int = int(number) if is_valid_card_format(number) else None
+
     def process(self, accounts):
-        from_acc = accounts.get(self.from_account_id)
-        to_acc = accounts.get(self.to_account_id)
+        from_acc = accounts[self.from_account_id]
+        to_acc = accounts[self.to_account_id]
 
-        if not IVerifyCreditCard.is_valid_card_format(self.card_number):
-            print("Invalid credit card format")
+        card_int = self._card_int
+        if card_int is None:
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("Invalid credit card format")
             return False
 
-        if not from_acc.verify_credit_card(self.card_number):
-            print("Failure: The card does not match the account.")
+        verify = from_acc.verify_credit_card
+        if not verify(card_int):
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("Failure: The card does not match the account.")
             return False
 
         return from_acc.transfer(self.amount, to_acc)
@@ -158,20 +263,26 @@ class CreditCardPayment(Payment):
 # === PAYPAL PAYMENT ===
 
 class PayPalPayment(Payment):
+    __slots__ = ("email",)
+
     def __init__(self, amount, from_id, to_id, email):
         super().__init__(amount, from_id, to_id)
         self.email = email
 
     def process(self, accounts):
-        from_acc = accounts.get(self.from_account_id)
-        to_acc = accounts.get(self.to_account_id)
+        from_acc = accounts[self.from_account_id]
+        to_acc = accounts[self.to_account_id]
 
-        if not IVerifyPayPal.is_valid_email_format(self.email):
-            print("Incorrect email format")
+        email = self.email
+        if not is_valid_email_format(email):
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("Incorrect email format")
             return False
 
-        if not from_acc.verify_paypal_email(self.email):
-            print("Failure: The email does not match the account")
+        verify = from_acc.verify_paypal_email
+        if not verify(email):
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("Failure: The email does not match the account")
             return False
 
         return from_acc.transfer(self.amount, to_acc)
@@ -192,25 +303,26 @@ def main():
         "A002": BankAccount("A002", 500.0, "1111222233334444", "user2@example.com")
     }
 
-    payments = [
-        CreditCardPayment(200.0, "A001", "A002", "1234567890123456"),
-        PayPalPayment(300.0, "A001", "A002", "wrong@example.com"),
-        CreditCardPayment(900.0, "A002", "A001", "1111222233334444"),
-        CreditCardPayment(100.0, "A001", "A001", "1234567890123456"),
-        PayPalPayment(50.0, "A001", "A002", "invalid")
-    ]
+    payments = Payment.create_batch([
+        (CreditCardPayment, 200.0, "A001", "A002", "1234567890123456"),
+        (PayPalPayment, 300.0, "A001", "A002", "wrong@example.com"),
+        (CreditCardPayment, 900.0, "A002", "A001", "1111222233334444"),
+        (CreditCardPayment, 100.0, "A001", "A001", "1234567890123456"),
+        (PayPalPayment, 50.0, "A001", "A002", "invalid")
+    ])
 
-    for payment in payments:
-        success = payment.process(accounts)
+    for payment, success in Payment.iter_process(payments, accounts):
         log_payment(payment, success)
         print("-" * 40)
 
+    report = []
     for acc in accounts.values():
-        print(acc)
-        acc.print_history()
-
-    print(f"\n Total payments made: {Payment.get_total_payments()}")
+        report.append(f"{acc}\n")
+        report.append(acc.format_history())
+    report.append(f"\n Total payments made: {Payment.get_total_payments()}\n")
+    sys.stdout.write("".join(report))
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     main()